@@ -3,6 +3,9 @@ from flask_wtf.csrf import CSRFProtect
 from app.config import Config
 from app.utils.logging import configure_logging
 from app.db import init_app
+from app.utils.storage import init_storage
+from app.utils.images import init_images
+from app.utils.catalog import product_image_url
 
 csrf = CSRFProtect()
 
@@ -13,8 +16,12 @@ def create_app(config_class=Config):
     # Initialize extensions
     csrf.init_app(app)
     init_app(app) # Database teardown
+    init_storage(app) # Image storage backend
+    init_images(app) # Resized image variants
     configure_logging(app)
 
+    app.jinja_env.globals['image_url'] = product_image_url
+
     # Context processors
     @app.context_processor
     def inject_site():
@@ -22,7 +29,7 @@ def create_app(config_class=Config):
         base_url = configured_url.rstrip('/') if configured_url else request.url_root.rstrip('/')
         return dict(SITE={
             'name': 'Divsa Polymers',
-            'brand_line': 'Divsa Polymers by Adinath Industries',
+            'brand_line': app.config['BRAND_LINE'],
             'parent_name': 'Adinath Industries',
             'url': base_url,
             'phone': app.config.get('COMPANY_PHONE', '+918607125915'),
@@ -40,9 +47,13 @@ def create_app(config_class=Config):
     # Blueprints
     from app.routes.main import main_bp
     from app.routes.admin import admin_bp
+    from app.routes.api import api_bp
+    from app.routes.images import images_bp
     
     app.register_blueprint(main_bp)
     app.register_blueprint(admin_bp)
+    app.register_blueprint(api_bp)
+    app.register_blueprint(images_bp)
 
     @app.errorhandler(404)
     def page_not_found(e):
@@ -1,4 +1,5 @@
 import os
+import tempfile
 from dotenv import load_dotenv
 
 # Load .env from project root
@@ -12,6 +13,7 @@ class Config:
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     DEBUG = os.environ.get('FLASK_DEBUG', '0') == '1'
     SITE_URL = os.environ.get('SITE_URL', 'https://www.divsapolymers.com')
+    BRAND_LINE = 'Divsa Polymers by Adinath Industries'
 
     # Security settings
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max upload
@@ -24,7 +26,19 @@ class Config:
 
     # MongoDB Atlas configuration
     MONGODB_URI = os.environ.get('MONGODB_URI', '')
+    # Shared per-process pool; size it to the number of in-flight requests a worker can hold
+    MONGODB_MAX_POOL_SIZE = int(os.environ.get('MONGODB_MAX_POOL_SIZE', 100))
+    # Worker warm-up skips its database pages if Mongo is slower than this
+    WARMUP_DB_TIMEOUT_MS = int(os.environ.get('WARMUP_DB_TIMEOUT_MS', 3000))
     
+    # Image storage: 'local' (static/assets), 'blob' (Vercel Blob) or 'memory' (tests).
+    # Defaults to blob when a Vercel Blob token is present.
+    STORAGE_BACKEND = os.environ.get('STORAGE_BACKEND', '')
+
+    # Resized image variants served from /img/<name>
+    IMAGE_CACHE_DIR = os.environ.get('IMAGE_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'divsa-image-cache'))
+    IMAGE_CACHE_MAX_BYTES = int(os.environ.get('IMAGE_CACHE_MAX_BYTES', 200 * 1024 * 1024))
+
     # Email (SMTP) settings for inquiry notifications
     EMAIL_HOST = os.environ.get('EMAIL_HOST', '')
     EMAIL_PORT = int(os.environ.get('EMAIL_PORT', 587))
@@ -55,3 +69,4 @@ class DevelopmentConfig(Config):
 class TestingConfig(Config):
     TESTING = True
     DEBUG = True
+    STORAGE_BACKEND = 'memory'
@@ -1,34 +1,111 @@
 from pymongo import MongoClient
 import certifi
+import os
+import threading
 from flask import current_app, g
+from app.utils.catalog import backfill_slugs
+
+_client = None
+_client_pid = None
+_client_lock = threading.Lock()
+
+def ensure_indexes(db):
+    """
+    Create the indexes the catalog and admin queries rely on.
+
+    Runs outside the request path: once from the gunicorn master before
+    workers fork (see gunicorn_config.when_ready), and from
+    scripts/ensure_indexes.py for deployments without gunicorn (Vercel).
+    Errors propagate to the caller.
+    """
+    # Keyset pagination over the catalog, optionally filtered by type/quality
+    db.products.create_index([('date_created', -1), ('_id', -1)])
+    db.products.create_index([('type', 1), ('date_created', -1), ('_id', -1)])
+    db.products.create_index([('quality', 1), ('date_created', -1), ('_id', -1)])
+    # Detail pages look products up by slug, and renamed ones by a previous slug
+    backfill_slugs(db)
+    db.products.create_index('slug', unique=True)
+    db.products.create_index('previous_slugs')
+    # Admin inquiry table, newest first in keyset pages
+    db.inquiries.create_index([('date_submitted', -1), ('_id', -1)])
+    # Inquiry analytics counters, read per dimension by key or by count
+    db.inquiry_stats.create_index([('dim', 1), ('key', 1)])
+    db.inquiry_stats.create_index([('dim', 1), ('count', -1)])
+
+def _create_client(app):
+    return MongoClient(
+        app.config['MONGODB_URI'],
+        tlsCAFile=certifi.where(),
+        serverSelectionTimeoutMS=30000,
+        connectTimeoutMS=30000,
+        socketTimeoutMS=30000,
+        maxPoolSize=app.config.get('MONGODB_MAX_POOL_SIZE', 100),
+        retryWrites=False
+    )
+
+def ping_db(app, timeout_ms):
+    """
+    Return whether MongoDB answers within timeout_ms.
+
+    Uses a throwaway client so the short timeout never leaks into the
+    shared one that serves requests.
+    """
+    client = MongoClient(
+        app.config['MONGODB_URI'],
+        tlsCAFile=certifi.where(),
+        serverSelectionTimeoutMS=timeout_ms,
+        connectTimeoutMS=timeout_ms,
+        socketTimeoutMS=timeout_ms,
+        retryWrites=False
+    )
+    try:
+        client.admin.command('ping')
+        return True
+    except Exception as e:
+        app.logger.warning(f"MongoDB did not answer within {timeout_ms}ms: {e}")
+        return False
+    finally:
+        client.close()
+
+def get_client():
+    """
+    Return this process's shared MongoClient, creating it on first use.
+
+    MongoClient is thread- and greenlet-safe and pools its connections, so
+    one client per process replaces connecting on every request. The pid
+    check makes sure a forked worker never reuses its parent's sockets.
+    """
+    global _client, _client_pid
+    if _client is None or _client_pid != os.getpid():
+        with _client_lock:
+            if _client is None or _client_pid != os.getpid():
+                _client = _create_client(current_app)
+                _client_pid = os.getpid()
+    return _client
+
+def reset_client():
+    """Drop the shared client so the next get_client() connects afresh."""
+    global _client, _client_pid
+    with _client_lock:
+        if _client is not None and _client_pid == os.getpid():
+            _client.close()
+        _client = None
+        _client_pid = None
 
 def get_db():
     if 'db' not in g:
-        mongo_uri = current_app.config.get('MONGODB_URI')
-        if mongo_uri:
+        g.db = None
+        if current_app.config.get('MONGODB_URI'):
             try:
-                g.mongo_client = MongoClient(
-                    mongo_uri,
-                    tlsCAFile=certifi.where(),
-                    serverSelectionTimeoutMS=30000,
-                    connectTimeoutMS=30000,
-                    socketTimeoutMS=30000,
-                    retryWrites=False
-                )
-                g.db = g.mongo_client['divsa']
+                g.db = get_client()['divsa']
             except Exception as e:
                 current_app.logger.error(f"Failed to connect to MongoDB: {e}")
                 g.db = None
-                g.mongo_client = None
-        else:
-            g.db = None
-            g.mongo_client = None
     return g.db
 
 def close_db(e=None):
-    mongo_client = g.pop('mongo_client', None)
-    if mongo_client:
-        mongo_client.close()
+    # The shared client outlives the request; only the handle is dropped
+    g.pop('db', None)
 
 def init_app(app):
     app.teardown_appcontext(close_db)
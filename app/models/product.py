@@ -0,0 +1,86 @@
+from flask import url_for
+from jinja2.utils import htmlsafe_json_dumps
+from markupsafe import Markup
+from app.utils.catalog import GRID_IMAGE_WIDTH, product_image_url
+
+SUMMARY_LENGTH = 140
+THUMB_IMAGE_WIDTH = 160
+
+
+class ProductView:
+    """
+    Read-only product as the listing templates use it.
+
+    Everything a template would otherwise derive per render (image URLs,
+    quality CSS class, summary, JSON-LD) is computed once when the view is
+    built, and __slots__ keeps a cached catalog of views small. from_doc
+    builds the public catalog card; for_admin and for_api only fill what
+    the admin table and the load-more API need and leave the rest None.
+    """
+
+    __slots__ = (
+        'id', 'slug', 'name', 'description', 'summary', 'type', 'quality',
+        'quality_class', 'image', 'image_url', 'thumb_url', 'url', 'jsonld',
+    )
+
+    id: str
+    slug: str | None
+    name: str
+    description: str
+    summary: str | None
+    type: str
+    quality: str
+    quality_class: str
+    image: str
+    image_url: str | None
+    thumb_url: str | None
+    url: str | None
+    jsonld: Markup | None
+
+    @classmethod
+    def _from_fields(cls, doc):
+        view = cls()
+        view.id = str(doc['_id'])
+        view.slug = doc.get('slug')
+        view.name = doc.get('name') or ''
+        view.description = doc.get('description') or ''
+        view.type = doc.get('type') or ''
+        view.quality = doc.get('quality') or ''
+        view.quality_class = 'quality-' + view.quality.lower().replace(' ', '-')
+        view.image = doc.get('image') or 'factory-hero.jpg'
+        view.summary = view.image_url = view.thumb_url = view.url = view.jsonld = None
+        return view
+
+    @staticmethod
+    def _summarize(description):
+        if len(description) <= SUMMARY_LENGTH:
+            return description
+        return description[:SUMMARY_LENGTH - 3].rstrip() + '...'
+
+    @classmethod
+    def from_doc(cls, doc, base_url='', brand=''):
+        view = cls._from_fields(doc)
+        view.summary = cls._summarize(view.description)
+        view.image_url = product_image_url(view.image, GRID_IMAGE_WIDTH)
+        view.url = url_for('main.product_detail', slug=view.slug) if view.slug else None
+        view.jsonld = htmlsafe_json_dumps({
+            '@type': 'Product',
+            'name': view.name,
+            'description': view.description,
+            'url': f'{base_url}{view.url or "/products#" + view.id}',
+            'brand': {'@type': 'Brand', 'name': brand},
+            'material': 'PVC',
+        })
+        return view
+
+    @classmethod
+    def for_admin(cls, doc):
+        view = cls._from_fields(doc)
+        view.thumb_url = product_image_url(view.image, THUMB_IMAGE_WIDTH)
+        return view
+
+    @classmethod
+    def for_api(cls, doc):
+        view = cls._from_fields(doc)
+        view.summary = cls._summarize(view.description)
+        return view
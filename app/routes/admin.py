@@ -1,15 +1,30 @@
-from flask import Blueprint, render_template, request, flash, redirect, url_for, session, current_app
+from flask import Blueprint, render_template, request, flash, redirect, url_for, session, current_app, jsonify
 from functools import wraps
 from datetime import datetime
-from werkzeug.utils import secure_filename
+from werkzeug.exceptions import RequestEntityTooLarge
 from werkzeug.security import check_password_hash
 from app.db import get_db
-import os
+from app.utils.catalog import (
+    write_with_unique_slug, product_image_url, bump_catalog_version, encode_cursor, decode_cursor,
+    ADMIN_PRODUCT_FIELDS, PRODUCT_SORT
+)
+from app.models.product import ProductView
+from app.utils.storage import get_storage, UploadTooLarge
+from app.utils.bulk import extract_images, parse_product_rows, run_bulk
+from app.utils.analytics import load_inquiry_stats, rebuild_inquiry_stats
+import csv
 from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import DeleteOne, UpdateOne
+from pymongo.errors import DuplicateKeyError
 
 admin_bp = Blueprint('admin', __name__, url_prefix='/admin')
 
 ALLOWED_IMAGE_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'webp'}
+INQUIRY_PAGE_SIZE = 50
+
+def image_extension(filename):
+    return filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
 
 # Admin authentication decorator
 def admin_required(f):
@@ -61,9 +76,8 @@ def view_products():
         return render_template('admin/products.html', products=[])
     
     try:
-        products = list(db.products.find().sort('date_created', -1))
-        for p in products:
-            p['_id'] = str(p['_id'])
+        projection = {f: 1 for f in ADMIN_PRODUCT_FIELDS}
+        products = [ProductView.for_admin(p) for p in db.products.find({}, projection).sort(PRODUCT_SORT)]
         return render_template('admin/products.html', products=products)
     except Exception as e:
         current_app.logger.error(f"Error fetching products: {e}")
@@ -82,20 +96,13 @@ def add_product():
         image_filename = request.form.get('image') or 'factory-hero.jpg'
 
         if uploaded_image and uploaded_image.filename:
-            ext = uploaded_image.filename.rsplit('.', 1)[-1].lower()
+            ext = image_extension(uploaded_image.filename)
             if ext in ALLOWED_IMAGE_EXTENSIONS:
-                safe_name = secure_filename(uploaded_image.filename)
-                timestamp = datetime.utcnow().strftime('%Y%m%d%H%M%S')
-                image_filename = f'{timestamp}_{safe_name}'
-                # Save path needs to be absolute or relative to app root
                 try:
-                    assets_folder = os.path.join(current_app.static_folder, 'assets')
-                    if not os.path.exists(assets_folder):
-                        os.makedirs(assets_folder, exist_ok=True)
-                    uploaded_image.save(os.path.join(assets_folder, image_filename))
+                    image_filename = get_storage().save_stream(uploaded_image.stream, ext)
                 except Exception as e:
                     current_app.logger.error(f"Image upload failed: {e}")
-                    flash(f"Warning: Image upload failed ({e}). Note that Vercel has a read-only filesystem. Your product was saved with the default image.", 'error')
+                    flash(f"Warning: Image upload failed ({e}). Your product was saved with the default image.", 'error')
                     image_filename = 'factory-hero.jpg'
         
         product_data = {
@@ -111,7 +118,17 @@ def add_product():
         
         db = get_db()
         if db is not None:
-            db.products.insert_one(product_data)
+            def insert(slug):
+                # insert_one sets _id on the dict, which a retry must not reuse
+                product_data.pop('_id', None)
+                product_data['slug'] = slug
+                db.products.insert_one(product_data)
+            try:
+                write_with_unique_slug(db, name, insert)
+            except DuplicateKeyError:
+                flash('Could not find a free URL for this product name. Please try again.', 'error')
+                return render_template('admin/add_product.html')
+            bump_catalog_version(db)
             flash('Product added.', 'success')
             return redirect(url_for('admin.view_products'))
 
@@ -129,19 +146,13 @@ def edit_product(product_id):
 
         uploaded_image = request.files.get('image_file')
         if uploaded_image and uploaded_image.filename:
-            ext = uploaded_image.filename.rsplit('.', 1)[-1].lower()
+            ext = image_extension(uploaded_image.filename)
             if ext in ALLOWED_IMAGE_EXTENSIONS:
-                safe_name = secure_filename(uploaded_image.filename)
-                timestamp = datetime.utcnow().strftime('%Y%m%d%H%M%S')
-                image_filename = f'{timestamp}_{safe_name}'
                 try:
-                    assets_folder = os.path.join(current_app.static_folder, 'assets')
-                    if not os.path.exists(assets_folder):
-                        os.makedirs(assets_folder, exist_ok=True)
-                    uploaded_image.save(os.path.join(assets_folder, image_filename))
+                    image_filename = get_storage().save_stream(uploaded_image.stream, ext)
                 except Exception as e:
                     current_app.logger.error(f"Image update failed: {e}")
-                    flash(f"Warning: Image update failed ({e}). Note that Vercel has a read-only filesystem.", 'error')
+                    flash(f"Warning: Image update failed ({e}).", 'error')
                     # Retain original image if upload fails
                     existing_product = db.products.find_one({'_id': ObjectId(product_id)})
                     image_filename = existing_product.get('image', 'factory-hero.jpg') if existing_product else 'factory-hero.jpg'
@@ -156,14 +167,33 @@ def edit_product(product_id):
             'date_updated': datetime.utcnow()
         }
         
-        db.products.update_one({'_id': ObjectId(product_id)}, {'$set': update_data})
+        existing_product = db.products.find_one({'_id': ObjectId(product_id)}, {'name': 1, 'slug': 1})
+
+        def update(slug=None):
+            changes = {'$set': update_data}
+            if slug:
+                update_data['slug'] = slug
+                old_slug = existing_product.get('slug') if existing_product else None
+                if old_slug and old_slug != slug:
+                    # Published URLs keep working; product_detail redirects them
+                    changes['$addToSet'] = {'previous_slugs': old_slug}
+            db.products.update_one({'_id': ObjectId(product_id)}, changes)
+
+        try:
+            if existing_product and (existing_product.get('name') != name or not existing_product.get('slug')):
+                write_with_unique_slug(db, name, update, exclude_id=ObjectId(product_id))
+            else:
+                update()
+        except DuplicateKeyError:
+            flash('Could not find a free URL for this product name. Please try again.', 'error')
+            return redirect(url_for('admin.edit_product', product_id=product_id))
+        bump_catalog_version(db)
         flash('Product updated.', 'success')
         return redirect(url_for('admin.view_products'))
     
-    product = db.products.find_one({'_id': ObjectId(product_id)})
+    product = db.products.find_one({'_id': ObjectId(product_id)}, {'date_created': 0, 'date_updated': 0, 'slug': 0})
     if product:
         product['_id'] = str(product['_id'])
-        product['features'] = '\n'.join(product.get('features', []))
         return render_template('admin/edit_product.html', product=product)
     return redirect(url_for('admin.view_products'))
 
@@ -173,18 +203,145 @@ def delete_product(product_id):
     db = get_db()
     if db is not None:
         db.products.delete_one({'_id': ObjectId(product_id)})
+        bump_catalog_version(db)
         flash('Product deleted.', 'success')
     return redirect(url_for('admin.view_products'))
 
+@admin_bp.route('/images', methods=['POST'])
+@admin_required
+def upload_image():
+    """
+    Streamed upload: the request body is the raw image, read in chunks and
+    hashed on the way into storage, so nothing is buffered as form data.
+    """
+    ext = image_extension(request.args.get('filename', ''))
+    if ext not in ALLOWED_IMAGE_EXTENSIONS:
+        return jsonify(error='Unsupported image type'), 400
+    try:
+        image = get_storage().save_stream(request.stream, ext)
+    except UploadTooLarge as e:
+        return jsonify(error=str(e)), 413
+    except RequestEntityTooLarge:
+        # request.stream enforces MAX_CONTENT_LENGTH before storage sees a byte
+        return jsonify(error='Image is larger than the upload limit'), 413
+    except Exception as e:
+        current_app.logger.error(f"Image upload failed: {e}")
+        return jsonify(error=f'Image upload failed ({e})'), 500
+    return jsonify(image=image, url=product_image_url(image))
+
+@admin_bp.route('/products/import', methods=['GET', 'POST'])
+@admin_required
+def bulk_import():
+    if request.method == 'POST':
+        csv_file = request.files.get('csv_file')
+        if not csv_file or not csv_file.filename:
+            flash('Please choose a CSV file to import.', 'error')
+            return redirect(url_for('admin.bulk_import'))
+
+        db = get_db()
+        if db is None:
+            flash('Database not connected.', 'error')
+            return redirect(url_for('admin.bulk_import'))
+
+        images = {}
+        zip_file = request.files.get('images_zip')
+        if zip_file and zip_file.filename:
+            try:
+                images, image_errors = extract_images(zip_file, get_storage(), ALLOWED_IMAGE_EXTENSIONS)
+                for error in image_errors:
+                    flash(f'Image error: {error}', 'error')
+            except Exception as e:
+                current_app.logger.error(f"Bulk image upload failed: {e}")
+                flash(f"Warning: Image upload failed ({e}).", 'error')
+
+        try:
+            report, operations, op_rows = parse_product_rows(csv_file, images)
+        except (UnicodeDecodeError, csv.Error) as e:
+            flash(f'Could not read CSV: {e}', 'error')
+            return redirect(url_for('admin.bulk_import'))
+
+        for row_index, (status, message) in zip(op_rows, run_bulk(db.products, operations)):
+            report[row_index]['status'] = 'updated' if status == 'ok' else status
+            report[row_index]['message'] = message
+        if operations:
+            bump_catalog_version(db)
+
+        created = sum(1 for r in report if r['status'] == 'created')
+        updated = sum(1 for r in report if r['status'] == 'updated')
+        failed = sum(1 for r in report if r['status'] == 'error')
+        if failed:
+            flash(f'Import finished with errors: {created} created, {updated} updated, {failed} failed.', 'error')
+        else:
+            flash(f'Import finished successfully: {created} created, {updated} updated.', 'success')
+        return render_template('admin/bulk_import.html', report=report)
+
+    return render_template('admin/bulk_import.html', report=None)
+
+@admin_bp.route('/products/bulk', methods=['POST'])
+@admin_required
+def bulk_products():
+    db = get_db()
+    if db is None:
+        flash('Database not connected.', 'error')
+        return redirect(url_for('admin.view_products'))
+
+    try:
+        ids = [ObjectId(pid) for pid in request.form.getlist('product_ids')]
+    except InvalidId:
+        flash('Invalid product selection.', 'error')
+        return redirect(url_for('admin.view_products'))
+    if not ids:
+        flash('No products selected.', 'info')
+        return redirect(url_for('admin.view_products'))
+
+    action = request.form.get('bulk_action')
+    if action == 'delete':
+        operations = [DeleteOne({'_id': pid}) for pid in ids]
+    elif action == 'edit':
+        changes = {f: request.form.get(f) for f in ('type', 'quality') if request.form.get(f)}
+        if not changes:
+            flash('Choose a type or quality to apply.', 'info')
+            return redirect(url_for('admin.view_products'))
+        changes['date_updated'] = datetime.utcnow()
+        operations = [UpdateOne({'_id': pid}, {'$set': changes}) for pid in ids]
+    else:
+        flash('Unknown bulk action.', 'error')
+        return redirect(url_for('admin.view_products'))
+
+    outcomes = run_bulk(db.products, operations)
+    bump_catalog_version(db)
+    failed = [message for status, message in outcomes if status == 'error']
+    done = len(outcomes) - len(failed)
+    verb = 'deleted' if action == 'delete' else 'updated'
+    if failed:
+        flash(f'Bulk action finished with errors: {done} products {verb}, {len(failed)} failed ({failed[0]}).', 'error')
+    else:
+        flash(f'{done} products {verb} successfully.', 'success')
+    return redirect(url_for('admin.view_products'))
+
 @admin_bp.route('/inquiries')
 @admin_required
 def view_inquiries():
     db = get_db()
-    if db is None: return render_template('admin/inquiries.html', inquiries=[])
-    
-    # Aggregation logic
+    if db is None: return render_template('admin/inquiries.html', inquiries=[], stats=None, next_cursor=None)
+
+    # Keyset page of the newest inquiries; the product lookup only runs for that page
+    match = {}
+    cursor = request.args.get('cursor')
+    if cursor:
+        try:
+            date_submitted, last_id = decode_cursor(cursor)
+            match = {'$or': [
+                {'date_submitted': {'$lt': date_submitted}},
+                {'date_submitted': date_submitted, '_id': {'$lt': last_id}},
+            ]}
+        except ValueError:
+            return redirect(url_for('admin.view_inquiries'))
+
     pipeline = [
-        {'$sort': {'date_submitted': -1}},
+        {'$match': match},
+        {'$sort': {'date_submitted': -1, '_id': -1}},
+        {'$limit': INQUIRY_PAGE_SIZE + 1},
         {'$addFields': {
             'pid_obj': {
                 '$convert': {
@@ -207,6 +364,11 @@ def view_inquiries():
         }}
     ]
     inquiries = list(db.inquiries.aggregate(pipeline))
+    next_cursor = None
+    if len(inquiries) > INQUIRY_PAGE_SIZE:
+        inquiries = inquiries[:INQUIRY_PAGE_SIZE]
+        if isinstance(inquiries[-1].get('date_submitted'), datetime):
+            next_cursor = encode_cursor(inquiries[-1], 'date_submitted')
     # Post processing
     for i in inquiries:
         i['_id'] = str(i['_id'])
@@ -218,4 +380,26 @@ def view_inquiries():
         elif i.get('product_id'): i['product_name'] = 'Not Found'
         else: i['product_name'] = None
         
-    return render_template('admin/inquiries.html', inquiries=inquiries)
+    try:
+        stats = load_inquiry_stats(db)
+    except Exception as e:
+        current_app.logger.error(f"Error loading inquiry stats: {e}")
+        stats = None
+
+    return render_template('admin/inquiries.html', inquiries=inquiries, stats=stats,
+                           next_cursor=next_cursor, cursor=cursor)
+
+@admin_bp.route('/inquiries/stats/rebuild', methods=['POST'])
+@admin_required
+def rebuild_stats():
+    db = get_db()
+    if db is None:
+        flash('Database not connected.', 'error')
+        return redirect(url_for('admin.view_inquiries'))
+    try:
+        rebuild_inquiry_stats(db)
+        flash('Inquiry analytics rebuilt successfully.', 'success')
+    except Exception as e:
+        current_app.logger.error(f"Error rebuilding inquiry stats: {e}")
+        flash(f'Error rebuilding analytics: {e}', 'error')
+    return redirect(url_for('admin.view_inquiries'))
@@ -0,0 +1,49 @@
+from flask import Blueprint, request, jsonify, current_app
+from app.db import get_db
+from app.utils.catalog import (
+    DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, FILTER_FIELDS, VIEW_PRODUCT_FIELDS,
+    fetch_product_page, parse_fields, serialize_product
+)
+from app.models.product import ProductView
+
+api_bp = Blueprint('api', __name__, url_prefix='/api')
+
+@api_bp.route('/products')
+def products():
+    try:
+        fields = parse_fields(request.args.get('fields'))
+        limit = request.args.get('limit', DEFAULT_PAGE_SIZE, type=int)
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+    except ValueError as e:
+        return jsonify(error=str(e)), 400
+
+    db = get_db()
+    if db is None:
+        return jsonify(error='Database not connected'), 503
+
+    filters = {f: request.args.get(f) for f in FILTER_FIELDS}
+    try:
+        products_list, next_cursor = fetch_product_page(
+            db, filters=filters, cursor=request.args.get('cursor'), limit=limit, fields=fields
+        )
+    except ValueError as e:
+        return jsonify(error=str(e)), 400
+    except Exception as e:
+        current_app.logger.error(f'Error fetching products: {e}')
+        return jsonify(error='Could not fetch products'), 500
+
+    items = []
+    view_fields = [f for f in fields if f in VIEW_PRODUCT_FIELDS]
+    for product in products_list:
+        item = serialize_product(product, fields)
+        if view_fields:
+            # Same derivations as the server-rendered grid, so the JS has none of its own
+            view = ProductView.for_api(product)
+            item.update({f: getattr(view, f) for f in view_fields})
+        items.append(item)
+
+    response = jsonify(items=items, next_cursor=next_cursor)
+    # Weak ETag over the body lets clients revalidate pages cheaply
+    response.add_etag(weak=True)
+    response.headers['Cache-Control'] = 'public, max-age=60'
+    return response.make_conditional(request)
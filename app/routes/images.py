@@ -0,0 +1,40 @@
+import os
+from flask import Blueprint, request, abort, send_file, current_app, redirect, url_for
+from werkzeug.security import safe_join
+from app.utils.catalog import image_version
+from app.utils.images import ALLOWED_WIDTHS, FORMATS, DEFAULT_FORMAT
+
+images_bp = Blueprint('images', __name__)
+
+UNVERSIONED_MAX_AGE = 24 * 60 * 60
+
+@images_bp.route('/img/<path:name>')
+def image(name):
+    width = request.args.get('w', type=int)
+    fmt = request.args.get('fmt', DEFAULT_FORMAT)
+    if width not in ALLOWED_WIDTHS or fmt not in FORMATS:
+        abort(400)
+
+    source_path = safe_join(os.path.join(current_app.static_folder, 'assets'), name)
+    if source_path is None or not os.path.isfile(source_path):
+        abort(404)
+
+    resizer = current_app.extensions.get('image_resizer')
+    if resizer is None:
+        # Without Pillow (e.g. on Vercel) pages link originals; old links still resolve
+        return redirect(url_for('static', filename='assets/' + name))
+
+    try:
+        path = resizer.get(source_path, width, fmt)
+    except Exception as e:
+        current_app.logger.error(f'Image resize failed for {name}: {e}')
+        abort(404)
+
+    response = send_file(path, mimetype=FORMATS[fmt][1], conditional=True)
+    # Only a URL naming the current source version can be cached for good;
+    # unversioned or stale ones must pick up a replaced file
+    if request.args.get('v') == image_version(source_path):
+        response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    else:
+        response.headers['Cache-Control'] = f'public, max-age={UNVERSIONED_MAX_AGE}'
+    return response
@@ -1,13 +1,37 @@
-from flask import Blueprint, render_template, request, flash, redirect, url_for, send_from_directory, current_app, make_response
+from flask import Blueprint, render_template, request, flash, redirect, url_for, send_from_directory, current_app, make_response, abort, jsonify
+from markupsafe import Markup
+from functools import wraps
 from datetime import datetime
 from app.db import get_db
 from app.utils.email import send_inquiry_email
+from app.utils.analytics import record_inquiry
+from app.utils.catalog import FILTER_FIELDS, fetch_product_page, catalog_version
+from app.utils.cache import RenderCache
 from app.models.validation import InquiryModel
+from app.models.product import ProductView
 from pydantic import ValidationError
 import os
 
 main_bp = Blueprint('main', __name__)
 
+product_page_cache = RenderCache()
+static_page_cache = RenderCache(max_entries=64)
+# First catalog page as ProductViews, per filter combination and catalog version
+catalog_view_cache = RenderCache(max_entries=64)
+
+def cached_page(view):
+    """Cache the HTML of pages that render the same for every visitor."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        # SITE.url falls back to the request host when SITE_URL is unset
+        version = (current_app.config.get('SITE_URL') or '').strip() or request.url_root
+        html = static_page_cache.get(request.path, version)
+        if html is None:
+            html = view(*args, **kwargs)
+            static_page_cache.set(request.path, version, html)
+        return html
+    return wrapper
+
 @main_bp.route('/')
 def home():
     return render_template('index.html')
@@ -16,14 +40,50 @@ def home():
 def products():
     db = get_db()
     products_list = []
+    next_cursor = None
     if db is not None:
         try:
-            products_list = list(db.products.find().sort('date_created', -1))
-            for p in products_list:
-                p['id'] = str(p['_id'])
+            # Only the first page is rendered; the rest is loaded from /api/products
+            filters = tuple((f, request.args.get(f) or '') for f in FILTER_FIELDS)
+            base_url = (current_app.config.get('SITE_URL') or '').strip().rstrip('/') or request.url_root.rstrip('/')
+            version = (catalog_version(db), base_url)
+            page = catalog_view_cache.get(filters, version)
+            if page is None:
+                docs, next_cursor = fetch_product_page(db, filters=dict(filters))
+                brand = current_app.config['BRAND_LINE']
+                page = ([ProductView.from_doc(d, base_url, brand) for d in docs], next_cursor)
+                catalog_view_cache.set(filters, version, page)
+            products_list, next_cursor = page
         except Exception as e:
             current_app.logger.error(f'Error fetching products: {e}')
-    return render_template('products.html', products=products_list)
+    return render_template('products.html', products=products_list, next_cursor=next_cursor)
+
+@main_bp.route('/products/<slug>')
+def product_detail(slug):
+    db = get_db()
+    if db is None:
+        abort(404)
+    try:
+        product = db.products.find_one({'slug': slug})
+        if product is None:
+            # A renamed product keeps answering on its old URLs
+            renamed = db.products.find_one({'previous_slugs': slug}, {'slug': 1})
+            if renamed and renamed.get('slug'):
+                return redirect(url_for('main.product_detail', slug=renamed['slug']), 301)
+    except Exception as e:
+        current_app.logger.error(f'Error fetching product {slug}: {e}')
+        product = None
+    if product is None:
+        abort(404)
+    product['id'] = str(product['_id'])
+
+    # The product body only changes when the product does, so it is cached per date_updated
+    version = product.get('date_updated')
+    detail_html = product_page_cache.get(slug, version)
+    if detail_html is None:
+        detail_html = Markup(render_template('_product_detail.html', product=product))
+        product_page_cache.set(slug, version, detail_html)
+    return render_template('product-detail.html', product=product, detail_html=detail_html)
 
 @main_bp.route('/submit-inquiry', methods=['POST'])
 def submit_inquiry():
@@ -49,6 +109,10 @@ def submit_inquiry():
         db = get_db()
         if db is not None:
             db.inquiries.insert_one(data)
+            try:
+                record_inquiry(db, data)
+            except Exception as e:
+                current_app.logger.error(f'Failed to update inquiry stats: {e}')
             flash(f"Success! {data['name']}, your inquiry has been saved.", 'success')
             send_inquiry_email(data)
             return redirect(url_for('main.thank_you'))
@@ -68,11 +132,13 @@ def submit_inquiry():
         return redirect(url_for('main.home') + '#dealership')
 
 @main_bp.route('/thank-you')
+@cached_page
 def thank_you():
     return render_template('thank-you.html')
 
 # Static pages
 @main_bp.route('/pvc-garden-pipes')
+@cached_page
 def pvc_garden_pipes():
     faqs = [
         {"question": "Are your PVC garden pipes UV resistant?", "answer": "Yes — our garden pipes are UV stabilized for long outdoor life."},
@@ -83,6 +149,7 @@ def pvc_garden_pipes():
     return render_template('pvc-garden-pipes.html', faqs=faqs)
 
 @main_bp.route('/pvc-braided-pipes')
+@cached_page
 def pvc_braided_pipes():
     faqs = [
         {"question": "Are braided pipes suitable for high-pressure use?", "answer": "Yes — braided reinforcement increases burst pressure tolerance."},
@@ -93,6 +160,7 @@ def pvc_braided_pipes():
     return render_template('pvc-braided-pipes.html', faqs=faqs)
 
 @main_bp.route('/pvc-recycled-pipes')
+@cached_page
 def pvc_recycled_pipes():
     faqs = [
         {"question": "Are recycled PVC pipes as strong as virgin PVC?", "answer": "Our recycled products meet strict QA standards and perform comparably for many applications."},
@@ -103,25 +171,36 @@ def pvc_recycled_pipes():
     return render_template('pvc-recycled-pipes.html', faqs=faqs)
 
 @main_bp.route('/infrastructure')
+@cached_page
 def infrastructure():
     return render_template('infrastructure.html')
 
 # SEO Pages
 @main_bp.route('/pvc-pipes-in-ambala')
+@cached_page
 def pvc_pipes_in_ambala(): return render_template('pvc-pipes-in-ambala.html', city='Ambala')
 
 @main_bp.route('/pvc-pipes-in-delhi')
+@cached_page
 def pvc_pipes_in_delhi(): return render_template('pvc-pipes-in-delhi.html', city='Delhi')
 
 @main_bp.route('/pvc-pipes-in-punjab')
+@cached_page
 def pvc_pipes_in_punjab(): return render_template('pvc-pipes-in-punjab.html', city='Punjab')
 
+@main_bp.route('/readyz')
+def readiness():
+    # Under gunicorn a worker accepts connections only after warm-up, so
+    # answering at all means it is ready
+    return jsonify(status='ready')
+
 @main_bp.route('/robots.txt')
 def robots_txt():
     lines = [
         'User-agent: *',
         'Allow: /',
         'Disallow: /admin',
+        'Disallow: /api',
         f"Sitemap: {url_for('main.sitemap', _external=True)}"
     ]
     response = make_response('\n'.join(lines))
@@ -138,6 +217,7 @@ def sitemap():
         'static',
         'main.sitemap',
         'main.robots_txt',
+        'main.readiness',
         'main.submit_inquiry',
         'main.favicon',
         'admin.index',
@@ -147,7 +227,8 @@ def sitemap():
         'admin.edit_product',
         'admin.delete_product',
         'admin.inquiries',
-        'admin.products'
+        'admin.products',
+        'api.products'
     ]
 
     pages = []
@@ -162,6 +243,18 @@ def sitemap():
                 priority = '1.0' if rule.endpoint == 'main.home' else '0.9'
                 pages.append({'loc': url, 'priority': priority})
 
+    # Product detail pages
+    db = get_db()
+    if db is not None:
+        try:
+            for product in db.products.find({'slug': {'$exists': True}}, {'slug': 1, 'date_updated': 1}):
+                page = {'loc': url_for('main.product_detail', slug=product['slug'], _external=True), 'priority': '0.8'}
+                if product.get('date_updated'):
+                    page['lastmod'] = product['date_updated'].strftime('%Y-%m-%d')
+                pages.append(page)
+        except Exception as e:
+            current_app.logger.error(f'Error fetching products for sitemap: {e}')
+
     # Sort pages by URL for consistency
     pages.sort(key=lambda x: x['loc'])
     
@@ -173,8 +266,9 @@ def sitemap():
     for page in pages:
         xml.append('<url>')
         xml.append(f"    <loc>{page['loc']}</loc>")
+        if page.get('lastmod'):
+            xml.append(f"    <lastmod>{page['lastmod']}</lastmod>")
         xml.append(f"    <priority>{page['priority']}</priority>")
-        # You can add <lastmod> and <changefreq> if you have that info
         xml.append('</url>')
     
     xml.append('</urlset>')
@@ -0,0 +1,43 @@
+// --- Streamed image upload for the admin product forms ---
+// Sends the selected file as the raw request body so the server can hash and
+// store it chunk by chunk; the returned image reference fills the image field.
+document.addEventListener('DOMContentLoaded', function () {
+    const fileInput = document.getElementById('image_file');
+    const imageInput = document.getElementById('image');
+    if (!fileInput || !imageInput || !fileInput.dataset.uploadUrl || !window.fetch) return;
+
+    const status = document.createElement('small');
+    status.style.cssText = 'display: block; margin-top: 5px; font-size: 0.85rem;';
+    fileInput.insertAdjacentElement('afterend', status);
+
+    fileInput.addEventListener('change', function () {
+        const file = fileInput.files[0];
+        if (!file) return;
+
+        const csrfInput = fileInput.form.querySelector('input[name="csrf_token"]');
+        const url = fileInput.dataset.uploadUrl + '?filename=' + encodeURIComponent(file.name);
+        status.style.color = 'var(--text-secondary)';
+        status.textContent = 'Uploading ' + file.name + '...';
+
+        fetch(url, {
+            method: 'POST',
+            body: file,
+            credentials: 'same-origin',
+            headers: { 'X-CSRFToken': csrfInput ? csrfInput.value : '' }
+        })
+        .then(response => response.json().then(data => ({ ok: response.ok, data })))
+        .then(({ ok, data }) => {
+            if (!ok) throw new Error(data.error || 'Upload failed');
+            imageInput.value = data.image;
+            // Already stored; don't send the file again with the form
+            fileInput.value = '';
+            status.style.color = '#155724';
+            status.textContent = 'Uploaded ✓';
+        })
+        .catch(err => {
+            // Leave the file selected so the normal form upload still happens
+            status.style.color = '#721c24';
+            status.textContent = err.message + ' — the image will be sent with the form instead.';
+        });
+    });
+});
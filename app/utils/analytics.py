@@ -0,0 +1,122 @@
+from datetime import datetime, timedelta
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import UpdateOne
+
+# Counters live in inquiry_stats, one small document per (dimension, key)
+# with _id "<dim>:<key>", e.g. "city:ambala" or "day:2026-10-19".
+DAYS_SHOWN = 30
+TOP_N = 10
+
+
+def _inquiry_keys(inquiry):
+    submitted = inquiry.get('date_submitted') or datetime.utcnow()
+    keys = {
+        'total': 'all',
+        'day': submitted.strftime('%Y-%m-%d'),
+        'city': (inquiry.get('city') or '').strip().lower() or 'unknown',
+        'inquiry_type': inquiry.get('inquiry_type') or 'general',
+    }
+    if inquiry.get('product_id'):
+        keys['product'] = inquiry['product_id']
+    return keys
+
+
+def record_inquiry(db, inquiry):
+    """Bump the summary counters for one new inquiry in a single round-trip."""
+    operations = [
+        UpdateOne(
+            {'_id': f'{dim}:{key}'},
+            {'$inc': {'count': 1}, '$setOnInsert': {'dim': dim, 'key': key}},
+            upsert=True
+        )
+        for dim, key in _inquiry_keys(inquiry).items()
+    ]
+    db.inquiry_stats.bulk_write(operations, ordered=False)
+
+
+def rebuild_inquiry_stats(db):
+    """
+    Recompute every counter from the inquiries collection.
+
+    Only needed to backfill inquiries saved before the counters existed or
+    to repair drift; each dimension is grouped server-side and written
+    with $merge so no inquiry documents travel to the app.
+
+    Counters are replaced in place rather than cleared first, so the
+    dashboard never reads an empty or half-built set. Each rebuilt counter
+    is stamped, and counters an earlier rebuild wrote that this one did
+    not (keys with no inquiries left) are removed at the end.
+    """
+    city = {'$toLower': {'$trim': {'input': {'$ifNull': ['$city', '']}}}}
+    key_exprs = {
+        'total': {'$literal': 'all'},
+        'day': {'$dateToString': {'format': '%Y-%m-%d', 'date': '$date_submitted'}},
+        'city': {'$cond': [{'$eq': [city, '']}, 'unknown', city]},
+        'inquiry_type': {'$ifNull': ['$inquiry_type', 'general']},
+        'product': '$product_id',
+    }
+
+    stamp = datetime.utcnow()
+    for dim, key_expr in key_exprs.items():
+        pipeline = []
+        if dim == 'product':
+            pipeline.append({'$match': {'product_id': {'$nin': [None, '']}}})
+        elif dim == 'day':
+            pipeline.append({'$match': {'date_submitted': {'$type': 'date'}}})
+        pipeline += [
+            {'$group': {'_id': key_expr, 'count': {'$sum': 1}}},
+            {'$project': {
+                '_id': {'$concat': [f'{dim}:', '$_id']},
+                'dim': {'$literal': dim},
+                'key': '$_id',
+                'count': 1,
+                'rebuilt_at': {'$literal': stamp}
+            }},
+            {'$merge': {'into': 'inquiry_stats', 'whenMatched': 'replace', 'whenNotMatched': 'insert'}},
+        ]
+        db.inquiries.aggregate(pipeline)
+    db.inquiry_stats.delete_many({'rebuilt_at': {'$lt': stamp}})
+    db.meta.update_one({'_id': 'inquiry_stats'}, {'$set': {'rebuilt_at': stamp}}, upsert=True)
+
+
+def ensure_inquiry_stats(db):
+    """
+    Backfill the counters once, the first time they are read.
+
+    record_inquiry only counts inquiries saved after it shipped, so until
+    a rebuild has run the counters would miss all earlier ones. The
+    rebuild marks db.meta when it finishes; this runs it if no mark exists.
+    """
+    if db.meta.count_documents({'_id': 'inquiry_stats'}, limit=1) == 0:
+        rebuild_inquiry_stats(db)
+
+
+def load_inquiry_stats(db):
+    """Read the pre-aggregated counters the dashboard panel shows."""
+    ensure_inquiry_stats(db)
+    cutoff = (datetime.utcnow() - timedelta(days=DAYS_SHOWN - 1)).strftime('%Y-%m-%d')
+    total = db.inquiry_stats.find_one({'_id': 'total:all'}) or {}
+    by_day = list(db.inquiry_stats.find({'dim': 'day', 'key': {'$gte': cutoff}}).sort('key', -1))
+
+    def top(dim):
+        return list(db.inquiry_stats.find({'dim': dim}).sort('count', -1).limit(TOP_N))
+
+    by_product = top('product')
+    product_ids = []
+    for row in by_product:
+        try:
+            product_ids.append(ObjectId(row['key']))
+        except InvalidId:
+            pass
+    names = {str(p['_id']): p.get('name') for p in db.products.find({'_id': {'$in': product_ids}}, {'name': 1})}
+    for row in by_product:
+        row['name'] = names.get(row['key'], 'Not Found')
+
+    return {
+        'total': total.get('count', 0),
+        'by_day': by_day,
+        'by_city': top('city'),
+        'by_type': top('inquiry_type'),
+        'by_product': by_product,
+    }
@@ -0,0 +1,150 @@
+import csv
+import io
+import os
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pydantic import ValidationError
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+from werkzeug.utils import secure_filename
+from app.models.validation import ProductModel
+from app.utils.catalog import slugify
+
+BULK_BATCH_SIZE = 100
+IMAGE_WORKERS = 4
+MAX_ZIP_ENTRIES = 500
+
+# Features are a list, so CSV cells hold them separated by "|"
+FEATURE_SEPARATOR = '|'
+
+
+def run_bulk(collection, operations, batch_size=BULK_BATCH_SIZE):
+    """
+    Run operations as unordered bulk_write batches.
+
+    Returns one (status, message) tuple per operation, in input order, where
+    status is 'created' (upserted), 'ok' or 'error'. A failing operation
+    never stops the rest of its batch.
+    """
+    outcomes = []
+    for start in range(0, len(operations), batch_size):
+        batch = operations[start:start + batch_size]
+        try:
+            result = collection.bulk_write(batch, ordered=False)
+            upserted = result.upserted_ids or {}
+            errors = {}
+        except BulkWriteError as e:
+            details = e.details
+            upserted = {u['index']: u['_id'] for u in details.get('upserted', [])}
+            errors = {w['index']: w.get('errmsg', 'Write failed') for w in details.get('writeErrors', [])}
+
+        for i in range(len(batch)):
+            if i in errors:
+                outcomes.append(('error', errors[i]))
+            elif i in upserted:
+                outcomes.append(('created', None))
+            else:
+                outcomes.append(('ok', None))
+    return outcomes
+
+
+def _save_image(archive_bytes, member, storage):
+    # Each worker opens its own handle; ZipFile objects are not thread-safe
+    with zipfile.ZipFile(io.BytesIO(archive_bytes)) as archive:
+        with archive.open(member) as stream:
+            return storage.save_stream(stream, member.rsplit('.', 1)[-1].lower())
+
+
+def extract_images(zip_storage, storage, allowed_extensions):
+    """
+    Save every allowed image in an uploaded zip through the storage backend.
+
+    Returns ({original basename: stored image}, [error messages]).
+    """
+    archive_bytes = zip_storage.read()
+    try:
+        with zipfile.ZipFile(io.BytesIO(archive_bytes)) as archive:
+            members = [
+                m.filename for m in archive.infolist()
+                if not m.is_dir()
+                and m.filename.rsplit('.', 1)[-1].lower() in allowed_extensions
+                and secure_filename(os.path.basename(m.filename))
+            ][:MAX_ZIP_ENTRIES]
+    except zipfile.BadZipFile:
+        return {}, ['Image archive is not a valid zip file.']
+
+    images, errors = {}, []
+    with ThreadPoolExecutor(max_workers=IMAGE_WORKERS) as pool:
+        futures = {m: pool.submit(_save_image, archive_bytes, m, storage) for m in members}
+        for member, future in futures.items():
+            try:
+                images[os.path.basename(member)] = future.result()
+            except Exception as e:
+                errors.append(f'{member}: {e}')
+    return images, errors
+
+
+def parse_product_rows(csv_storage, images):
+    """
+    Validate CSV rows against ProductModel.
+
+    Returns (report, operations, op_rows): report has one entry per CSV row,
+    operations holds an upsert for every valid row, and op_rows[i] is the
+    index into report that operations[i] belongs to.
+    """
+    text = io.TextIOWrapper(csv_storage.stream, encoding='utf-8-sig', newline='')
+    now = datetime.utcnow()
+    report, operations, op_rows = [], [], []
+    seen_slugs = set()
+
+    for line_no, row in enumerate(csv.DictReader(text), start=2):
+        # DictReader puts cells beyond the header in a list under None
+        extra = row.pop(None, None)
+        row = {(k or '').strip().lower(): (v or '').strip() for k, v in row.items()}
+        entry = {'row': line_no, 'name': row.get('name', ''), 'status': 'error', 'message': None}
+        report.append(entry)
+
+        if extra:
+            entry['message'] = (f'{len(extra)} more cell(s) than the header has columns; '
+                                'quote values that contain commas')
+            continue
+
+        try:
+            product = ProductModel(
+                name=row.get('name', ''),
+                description=row.get('description', ''),
+                type=row.get('type', ''),
+                quality=row.get('quality', ''),
+                features=[f.strip() for f in row.get('features', '').split(FEATURE_SEPARATOR) if f.strip()]
+            )
+        except ValidationError as e:
+            entry['message'] = '; '.join(f"{err['loc'][0]}: {err['msg']}" for err in e.errors())
+            continue
+
+        slug = slugify(row.get('slug') or product.name)
+        if slug in seen_slugs:
+            entry['message'] = f'Duplicate slug "{slug}" earlier in the file'
+            continue
+        seen_slugs.add(slug)
+
+        data = product.model_dump()
+        data['date_updated'] = now
+        on_insert = {'date_created': now}
+        # A blank image cell keeps an existing product's image; only new
+        # products fall back to the default
+        image = row.get('image')
+        if image:
+            if not image.startswith('http'):
+                image = images.get(os.path.basename(image), image)
+            data['image'] = image
+        else:
+            on_insert['image'] = 'factory-hero.jpg'
+        operations.append(UpdateOne(
+            {'slug': slug},
+            {'$set': data, '$setOnInsert': on_insert},
+            upsert=True
+        ))
+        op_rows.append(len(report) - 1)
+
+    return report, operations, op_rows
@@ -0,0 +1,190 @@
+import base64
+import os
+import re
+from datetime import datetime
+from bson import ObjectId
+from bson.errors import InvalidId
+from flask import current_app, url_for
+from pymongo.errors import DuplicateKeyError
+
+DEFAULT_PAGE_SIZE = 12
+GRID_IMAGE_WIDTH = 480
+MAX_PAGE_SIZE = 50
+SLUG_ATTEMPTS = 5
+
+# Fields a public client may request through ?fields=
+PUBLIC_PRODUCT_FIELDS = ('name', 'slug', 'description', 'type', 'quality', 'image', 'features', 'date_created')
+# Also requestable: values ProductView derives, mapped to the stored field each is built from
+VIEW_PRODUCT_FIELDS = {'summary': 'description', 'quality_class': 'quality'}
+# What the catalog grid needs; full descriptions and features live on the detail page
+SUMMARY_PRODUCT_FIELDS = ('name', 'slug', 'description', 'type', 'quality', 'image')
+# What the admin product table needs
+ADMIN_PRODUCT_FIELDS = ('name', 'description', 'type', 'quality', 'image')
+FILTER_FIELDS = ('type', 'quality')
+
+# Newest first; _id breaks ties between products created in the same instant
+PRODUCT_SORT = [('date_created', -1), ('_id', -1)]
+
+
+def encode_cursor(doc, field='date_created'):
+    raw = f"{doc[field].isoformat()}|{doc['_id']}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Return (date, _id) for a cursor, or raise ValueError."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        date_part, id_part = base64.urlsafe_b64decode(padded.encode()).decode().split('|', 1)
+        return datetime.fromisoformat(date_part), ObjectId(id_part)
+    except (ValueError, InvalidId, UnicodeDecodeError) as e:
+        raise ValueError('Invalid cursor') from e
+
+
+def parse_fields(raw):
+    """Turn a comma separated ?fields= value into a validated tuple."""
+    if not raw:
+        return PUBLIC_PRODUCT_FIELDS
+    fields = tuple(f.strip() for f in raw.split(',') if f.strip())
+    unknown = [f for f in fields if f not in PUBLIC_PRODUCT_FIELDS and f not in VIEW_PRODUCT_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return fields
+
+
+def build_product_query(filters=None, cursor=None):
+    query = {k: v for k, v in (filters or {}).items() if k in FILTER_FIELDS and v}
+    if cursor:
+        date_created, last_id = decode_cursor(cursor)
+        query['$or'] = [
+            {'date_created': {'$lt': date_created}},
+            {'date_created': date_created, '_id': {'$lt': last_id}},
+        ]
+    return query
+
+
+def fetch_product_page(db, filters=None, cursor=None, limit=DEFAULT_PAGE_SIZE, fields=SUMMARY_PRODUCT_FIELDS):
+    """
+    Fetch one keyset page of products.
+
+    Returns (products, next_cursor). next_cursor is None on the last page.
+    date_created is always projected because the cursor is built from it.
+    """
+    projection = {VIEW_PRODUCT_FIELDS.get(f, f): 1 for f in fields}
+    projection['date_created'] = 1
+
+    query = build_product_query(filters, cursor)
+    # Read one extra document to learn whether another page exists
+    docs = list(db.products.find(query, projection).sort(PRODUCT_SORT).limit(limit + 1))
+
+    next_cursor = None
+    if len(docs) > limit:
+        docs = docs[:limit]
+        next_cursor = encode_cursor(docs[-1])
+
+    for p in docs:
+        p['id'] = str(p['_id'])
+    return docs, next_cursor
+
+
+def catalog_version(db):
+    """Counter bumped on every product write; cached catalog views key on it."""
+    doc = db.meta.find_one({'_id': 'catalog'}, {'version': 1})
+    return doc.get('version', 0) if doc else 0
+
+
+def bump_catalog_version(db):
+    db.meta.update_one({'_id': 'catalog'}, {'$inc': {'version': 1}}, upsert=True)
+
+
+def image_version(path):
+    """Version token for a source image; /img URLs carry it as ?v=."""
+    try:
+        return str(int(os.path.getmtime(path)))
+    except OSError:
+        return None
+
+
+def product_image_url(image, width=None, fmt=None):
+    """
+    URL for a product image. With a width, local images are served as a
+    resized variant from /img; remote (blob) images are returned as is,
+    and so are local ones when the resizer is not installed. Variant URLs
+    include the source's version, so replacing a file under the same name
+    changes its URL.
+    """
+    image = image or 'factory-hero.jpg'
+    if image.startswith('http'):
+        return image
+    if width and 'image_resizer' in current_app.extensions:
+        args = {'name': image, 'w': width}
+        if fmt:
+            args['fmt'] = fmt
+        version = image_version(os.path.join(current_app.static_folder, 'assets', image))
+        if version:
+            args['v'] = version
+        return url_for('images.image', **args)
+    return url_for('static', filename='assets/' + image)
+
+
+def serialize_product(product, fields):
+    """Stored fields of a product as JSON; VIEW_PRODUCT_FIELDS are left to the caller."""
+    data = {'id': product['id']}
+    for field in fields:
+        if field in VIEW_PRODUCT_FIELDS:
+            continue
+        value = product.get(field)
+        if isinstance(value, datetime):
+            value = value.isoformat()
+        data[field] = value
+    if 'image' in fields:
+        data['image_url'] = product_image_url(product.get('image'), GRID_IMAGE_WIDTH)
+    if product.get('slug'):
+        data['url'] = url_for('main.product_detail', slug=product['slug'])
+    return data
+
+
+def slugify(value):
+    slug = re.sub(r'[^a-z0-9]+', '-', (value or '').lower()).strip('-')
+    return slug or 'product'
+
+
+def unique_slug(db, name, exclude_id=None):
+    """Build a slug from name that no other product is using."""
+    base = slugify(name)
+    slug = base
+    suffix = 2
+    while True:
+        query = {'slug': slug}
+        if exclude_id is not None:
+            query['_id'] = {'$ne': exclude_id}
+        if db.products.count_documents(query, limit=1) == 0:
+            return slug
+        slug = f'{base}-{suffix}'
+        suffix += 1
+
+
+def write_with_unique_slug(db, name, write, exclude_id=None, attempts=SLUG_ATTEMPTS):
+    """
+    Call write(slug) with a free slug for name.
+
+    unique_slug checks before the write, so another writer can take the same
+    slug in between; the unique index then rejects ours and the next free
+    suffix is tried. Raises DuplicateKeyError once attempts run out.
+    """
+    for attempt in range(attempts):
+        slug = unique_slug(db, name, exclude_id=exclude_id)
+        try:
+            return write(slug)
+        except DuplicateKeyError:
+            if attempt == attempts - 1:
+                raise
+
+
+def backfill_slugs(db):
+    """Give products created before slugs existed a slug of their own."""
+    for product in db.products.find({'slug': {'$exists': False}}, {'name': 1}):
+        db.products.update_one(
+            {'_id': product['_id']},
+            {'$set': {'slug': unique_slug(db, product.get('name'), exclude_id=product['_id'])}}
+        )
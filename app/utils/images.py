@@ -0,0 +1,172 @@
+import hashlib
+import io
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+try:
+    from PIL import Image
+except ImportError:  # Pillow ships with requirements-server.txt only
+    Image = None
+try:
+    from gevent import monkey
+except ImportError:
+    monkey = None
+
+# Only these widths are rendered, so variants can't be requested without bound
+ALLOWED_WIDTHS = (160, 320, 480, 640, 960, 1280)
+FORMATS = {
+    'webp': ('WEBP', 'image/webp'),
+    'jpeg': ('JPEG', 'image/jpeg'),
+}
+DEFAULT_FORMAT = 'webp'
+RESIZE_WORKERS = 2
+
+
+def _gevent_patched():
+    return monkey is not None and monkey.is_module_patched('threading')
+
+
+def _native_lock():
+    """A lock that resize threads and request greenlets can both take."""
+    if _gevent_patched():
+        return monkey.get_original('threading', 'Lock')()
+    return threading.Lock()
+
+
+def _resize_executor(workers):
+    """
+    Pool the resizes run in. Under gevent workers the standard pool's
+    threads are greenlets, so a Pillow resize would block the hub and stall
+    every request on the worker; gevent's executor uses real OS threads
+    and its futures wait cooperatively.
+    """
+    if _gevent_patched():
+        from gevent.threadpool import ThreadPoolExecutor as NativeThreadPoolExecutor
+        return NativeThreadPoolExecutor(workers)
+    return ThreadPoolExecutor(max_workers=workers, thread_name_prefix='img-resize')
+
+
+class VariantCache:
+    """
+    Size-bounded LRU cache of encoded variants on disk.
+
+    A file's mtime is its last use; once the directory grows past max_bytes
+    the least recently used files are removed.
+    """
+
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = _native_lock()
+        os.makedirs(directory, exist_ok=True)
+        self._size = sum(e.stat().st_size for e in os.scandir(directory) if e.is_file())
+
+    def path(self, key):
+        return os.path.join(self.directory, key)
+
+    def get(self, key):
+        path = self.path(key)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def put(self, key, data):
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.part')
+        with os.fdopen(fd, 'wb') as tmp:
+            tmp.write(data)
+        os.replace(tmp_path, self.path(key))
+        with self._lock:
+            self._size += len(data)
+            if self._size > self.max_bytes:
+                self._evict()
+        return self.path(key)
+
+    def _evict(self):
+        entries = sorted(
+            (e for e in os.scandir(self.directory) if e.is_file() and not e.name.endswith('.part')),
+            key=lambda e: e.stat().st_mtime
+        )
+        # Other workers share the directory, so recount rather than trust _size
+        self._size = sum(e.stat().st_size for e in entries)
+        for entry in entries:
+            if self._size <= self.max_bytes * 0.9:
+                break
+            try:
+                size = entry.stat().st_size
+                os.remove(entry.path)
+                self._size -= size
+            except FileNotFoundError:
+                pass
+
+
+def render_variant(source_path, width, fmt):
+    pil_format, _ = FORMATS[fmt]
+    with Image.open(source_path) as img:
+        if img.width > width:
+            img.thumbnail((width, img.height * width // img.width + 1), Image.LANCZOS)
+        if pil_format == 'JPEG' and img.mode not in ('RGB', 'L'):
+            img = img.convert('RGB')
+        out = io.BytesIO()
+        img.save(out, pil_format, quality=80)
+    return out.getvalue()
+
+
+class ImageResizer:
+    """
+    Renders variants in a thread pool and coalesces concurrent requests:
+    callers asking for a variant that is already being rendered wait on
+    the same future instead of rendering it again.
+    """
+
+    def __init__(self, cache, workers=RESIZE_WORKERS):
+        self.cache = cache
+        self.workers = workers
+        # Built on first use, i.e. inside the worker rather than the
+        # preloading master, once gevent has (or hasn't) patched threading
+        self._pool = None
+        self._inflight = {}
+        self._lock = _native_lock()
+
+    @staticmethod
+    def variant_key(source_path, width, fmt):
+        # The source mtime is part of the key, so a replaced file gets fresh variants
+        stamp = f'{source_path}:{os.path.getmtime(source_path)}:{width}:{fmt}'
+        return f'{hashlib.sha1(stamp.encode()).hexdigest()}.{fmt}'
+
+    def _render(self, key, source_path, width, fmt):
+        try:
+            return self.cache.put(key, render_variant(source_path, width, fmt))
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def get(self, source_path, width, fmt):
+        """Return the path of the cached variant, rendering it if needed."""
+        key = self.variant_key(source_path, width, fmt)
+        path = self.cache.get(key)
+        if path is not None:
+            return path
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is None:
+                # A render may have finished between the check above and
+                # taking the lock; it has left _inflight but is in the cache
+                path = self.cache.get(key)
+                if path is not None:
+                    return path
+                if self._pool is None:
+                    self._pool = _resize_executor(self.workers)
+                future = self._pool.submit(self._render, key, source_path, width, fmt)
+                self._inflight[key] = future
+        return future.result()
+
+
+def init_images(app):
+    if Image is None:
+        app.logger.info('Pillow is not installed; /img serves original images')
+        return
+    cache = VariantCache(app.config['IMAGE_CACHE_DIR'], app.config['IMAGE_CACHE_MAX_BYTES'])
+    app.extensions['image_resizer'] = ImageResizer(cache)
@@ -0,0 +1,122 @@
+import hashlib
+import os
+import tempfile
+import threading
+from flask import current_app
+
+CHUNK_SIZE = 64 * 1024
+
+
+class UploadTooLarge(Exception):
+    pass
+
+
+def _hash_stream(stream, sink, max_bytes=None):
+    """Copy stream into sink chunk by chunk, returning its sha256 hex digest."""
+    digest = hashlib.sha256()
+    size = 0
+    while True:
+        chunk = stream.read(CHUNK_SIZE)
+        if not chunk:
+            break
+        size += len(chunk)
+        if max_bytes is not None and size > max_bytes:
+            raise UploadTooLarge(f'Upload exceeds {max_bytes} bytes')
+        digest.update(chunk)
+        sink.write(chunk)
+    return digest.hexdigest()
+
+
+def _content_name(digest, ext):
+    # Identical bytes always map to the same name, which is what deduplicates
+    return f'{digest[:32]}.{ext}'
+
+
+class LocalStorage:
+    """Images in static/assets, served as static files."""
+
+    def __init__(self, folder, max_bytes=None):
+        self.folder = folder
+        self.max_bytes = max_bytes
+
+    def save_stream(self, stream, ext):
+        os.makedirs(self.folder, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.folder, suffix='.part')
+        try:
+            with os.fdopen(fd, 'wb') as tmp:
+                digest = _hash_stream(stream, tmp, self.max_bytes)
+            name = _content_name(digest, ext)
+            target = os.path.join(self.folder, name)
+            if os.path.exists(target):
+                os.remove(tmp_path)
+            else:
+                os.replace(tmp_path, target)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return name
+
+
+class BlobStorage:
+    """
+    Images in Vercel Blob. The stored value is the public blob URL, so
+    browsers fetch images from the blob CDN rather than through Flask.
+    """
+
+    def __init__(self, prefix='products', max_bytes=None):
+        self.prefix = prefix
+        self.max_bytes = max_bytes
+
+    def save_stream(self, stream, ext):
+        import vercel_blob
+
+        # Hash while spooling; the blob API takes the body as bytes
+        with tempfile.SpooledTemporaryFile(max_size=1024 * 1024) as spool:
+            digest = _hash_stream(stream, spool, self.max_bytes)
+            path = f'{self.prefix}/{_content_name(digest, ext)}'
+
+            existing = vercel_blob.list({'prefix': path, 'limit': '1'}).get('blobs', [])
+            if existing:
+                return existing[0]['url']
+
+            spool.seek(0)
+            result = vercel_blob.put(path, spool.read(), {'addRandomSuffix': 'false'})
+        return result['url']
+
+
+class MemoryStorage:
+    """In-process stand-in for tests and local experiments."""
+
+    def __init__(self, max_bytes=None):
+        self.max_bytes = max_bytes
+        self.files = {}
+        self._lock = threading.Lock()
+
+    def save_stream(self, stream, ext):
+        with tempfile.SpooledTemporaryFile() as spool:
+            digest = _hash_stream(stream, spool, self.max_bytes)
+            spool.seek(0)
+            data = spool.read()
+        name = _content_name(digest, ext)
+        with self._lock:
+            self.files.setdefault(name, data)
+        return name
+
+
+def create_storage(app):
+    backend = app.config.get('STORAGE_BACKEND') or ('blob' if os.environ.get('BLOB_READ_WRITE_TOKEN') else 'local')
+    max_bytes = app.config.get('MAX_CONTENT_LENGTH')
+    if backend == 'blob':
+        return BlobStorage(max_bytes=max_bytes)
+    if backend == 'memory':
+        return MemoryStorage(max_bytes=max_bytes)
+    return LocalStorage(os.path.join(app.static_folder, 'assets'), max_bytes=max_bytes)
+
+
+def init_storage(app):
+    app.extensions['storage'] = create_storage(app)
+
+
+def get_storage():
+    return current_app.extensions['storage']
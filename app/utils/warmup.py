@@ -0,0 +1,87 @@
+from flask import url_for
+from app.db import ping_db, get_client, reset_client, ensure_indexes
+
+# Pages rendered during warm-up; the static ones land in the page cache
+WARM_ENDPOINTS = [
+    'main.home',
+    'main.pvc_garden_pipes',
+    'main.pvc_braided_pipes',
+    'main.pvc_recycled_pipes',
+    'main.infrastructure',
+    'main.pvc_pipes_in_ambala',
+    'main.pvc_pipes_in_delhi',
+    'main.pvc_pipes_in_punjab',
+    'main.thank_you',
+]
+# Pages that need MongoDB. The API comes first because it reports a failed
+# query as a 5xx, where the catalog page falls back to an empty list.
+WARM_DB_ENDPOINTS = [
+    'api.products',
+    'main.products',
+]
+
+
+def precompile_templates(app):
+    """Compile every Jinja template so forked workers inherit the bytecode."""
+    for name in app.jinja_env.list_templates():
+        app.jinja_env.get_template(name)
+
+
+def prepare_database(app):
+    """
+    Create indexes and backfill slugs once, in the gunicorn master.
+
+    Skipped (with a warning) if Mongo does not answer within
+    WARMUP_DB_TIMEOUT_MS; requests never run this DDL themselves. The
+    master's client is dropped afterwards so workers fork without it.
+    """
+    if not app.config.get('MONGODB_URI') or not ping_db(app, app.config['WARMUP_DB_TIMEOUT_MS']):
+        app.logger.warning('Skipped index creation; run scripts/ensure_indexes.py once MongoDB is reachable')
+        return
+    try:
+        with app.app_context():
+            ensure_indexes(get_client()['divsa'])
+    except Exception as e:
+        app.logger.error(f'Failed to ensure indexes: {e}')
+    finally:
+        reset_client()
+
+
+def warm_up(app, notify=None):
+    """
+    Exercise the slow first-request paths of a freshly forked worker.
+
+    Requesting the pages connects the Mongo pool, primes the catalog and
+    fills the static page cache. notify (the gunicorn worker's heartbeat)
+    is called between pages so a slow warm-up is not mistaken for a hung
+    worker. The database pages are only requested if
+    Mongo answers a ping within WARMUP_DB_TIMEOUT_MS, and are abandoned
+    after the first one fails. Failures are logged and never keep the
+    worker from serving.
+    """
+    notify = notify or (lambda: None)
+    try:
+        base_url = (app.config.get('SITE_URL') or 'http://localhost').rstrip('/')
+        with app.test_request_context(base_url=base_url):
+            urls = [url_for(endpoint) for endpoint in WARM_ENDPOINTS]
+            db_urls = [url_for(endpoint) for endpoint in WARM_DB_ENDPOINTS]
+
+        client = app.test_client()
+        for url in urls:
+            response = client.get(url, base_url=base_url)
+            if response.status_code >= 500:
+                app.logger.warning(f'Warm-up of {url} returned {response.status_code}')
+            notify()
+
+        if not app.config.get('MONGODB_URI') or not ping_db(app, app.config['WARMUP_DB_TIMEOUT_MS']):
+            app.logger.warning('Warm-up skipped the database pages')
+            return
+        notify()
+        for url in db_urls:
+            response = client.get(url, base_url=base_url)
+            notify()
+            if response.status_code >= 500:
+                app.logger.warning(f'Warm-up of {url} returned {response.status_code}; skipping the remaining database pages')
+                break
+    except Exception as e:
+        app.logger.error(f'Warm-up failed: {e}')
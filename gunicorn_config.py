@@ -1,10 +1,53 @@
 import os
 
+# With preload_app the master imports the app (pymongo, the image thread
+# pool, logging locks) before gunicorn's gevent worker would patch anything.
+# Patch here first so those modules are built on gevent primitives; an
+# unpatched lock or queue blocks the whole gevent worker.
+if os.environ.get('GUNICORN_WORKER_CLASS') == 'gevent':
+    from gevent import monkey
+    monkey.patch_all()
+
 workers = int(os.environ.get('GUNICORN_WORKERS', '2'))
 threads = int(os.environ.get('GUNICORN_THREADS', '4'))
 bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
 timeout = 120
-worker_class = 'gthread'
+# 'gevent' runs each request in a greenlet: blocking Mongo and SMTP calls yield
+# to other requests instead of holding one of the few gthread threads.
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+worker_connections = int(os.environ.get('GUNICORN_WORKER_CONNECTIONS', '500'))
 accesslog = '-'
 errorlog = '-'
 loglevel = 'info'
+
+# Import the app once in the master so workers fork with modules and
+# compiled templates already in memory.
+preload_app = os.environ.get('GUNICORN_PRELOAD', '1') == '1'
+
+# Recycle workers periodically to bound memory growth; the jitter keeps
+# them from all restarting (and warming up) at the same moment.
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', '1000'))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', '100'))
+
+
+def when_ready(server):
+    if preload_app:
+        from app.utils.warmup import precompile_templates, prepare_database
+        app = server.app.wsgi()
+        precompile_templates(app)
+        # Index DDL and the slug backfill run here once, not on a request path
+        prepare_database(app)
+
+
+def post_fork(server, worker):
+    from app.db import reset_client
+    # Never share the master's Mongo sockets with a forked worker
+    reset_client()
+
+
+# A worker only starts accepting connections once this returns, so it never
+# serves (or answers /readyz) before warm-up is done.
+def post_worker_init(worker):
+    from app.utils.warmup import warm_up
+    warm_up(worker.wsgi, notify=worker.notify)
+    worker.log.info('Worker %s warmed up', worker.pid)
@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+"""
+Create the MongoDB indexes the app relies on and give legacy products a slug.
+Run once after deploying to a new database, or whenever indexes change;
+gunicorn deployments also do this at startup, Vercel ones need this script.
+Usage: MONGODB_URI=... python scripts/ensure_indexes.py
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from app.db import ensure_indexes, get_client
+
+
+def main():
+    app = create_app()
+    if not app.config.get('MONGODB_URI'):
+        print("Error: MONGODB_URI is not set")
+        sys.exit(1)
+    with app.app_context():
+        ensure_indexes(get_client()['divsa'])
+    print("✓ Indexes created and slugs backfilled")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+import io
+
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+from werkzeug.datastructures import FileStorage
+
+from app.utils.bulk import parse_product_rows, run_bulk
+
+HEADER = 'name,description,type,quality,features,image\n'
+
+
+def parse(body, images=None):
+    csv_file = FileStorage(io.BytesIO((HEADER + body).encode()), filename='products.csv')
+    return parse_product_rows(csv_file, images or {})
+
+
+def test_valid_row_becomes_slug_upsert():
+    report, operations, op_rows = parse('Garden Hose,Durable garden hose pipe,Garden Pipes,Premium,UV|Light,\n')
+
+    assert report[0]['row'] == 2
+    assert op_rows == [0]
+    update = operations[0]._doc
+    assert operations[0]._filter == {'slug': 'garden-hose'}
+    assert update['$set']['features'] == ['UV', 'Light']
+    assert operations[0]._upsert
+
+
+def test_blank_image_only_defaults_on_insert():
+    _, operations, _ = parse('Garden Hose,Durable garden hose pipe,Garden Pipes,Premium,,\n')
+
+    update = operations[0]._doc
+    assert 'image' not in update['$set']
+    assert update['$setOnInsert']['image'] == 'factory-hero.jpg'
+
+
+def test_image_cell_resolves_zip_entry():
+    _, operations, _ = parse(
+        'Garden Hose,Durable garden hose pipe,Garden Pipes,Premium,,photos/hose.jpg\n',
+        images={'hose.jpg': 'abc123.jpg'}
+    )
+
+    update = operations[0]._doc
+    assert update['$set']['image'] == 'abc123.jpg'
+    assert 'image' not in update['$setOnInsert']
+
+
+def test_invalid_and_duplicate_rows_are_reported():
+    report, operations, op_rows = parse(
+        'X,short,Garden Pipes,Premium,,\n'
+        'Garden Hose,Durable garden hose pipe,Garden Pipes,Premium,,\n'
+        'Garden Hose,Another long description,Garden Pipes,Premium,,\n'
+    )
+
+    assert [e['status'] for e in report] == ['error', 'error', 'error']
+    assert 'name' in report[0]['message'] and 'description' in report[0]['message']
+    assert report[1]['message'] is None
+    assert 'Duplicate slug' in report[2]['message']
+    assert op_rows == [1]
+    assert len(operations) == 1
+
+
+def test_extra_cells_are_a_row_error():
+    report, operations, _ = parse(
+        'Garden Hose,Heavy duty, UV stable,Garden Pipes,Premium,,\n'
+        'Braided Pipe,Durable braided pipe,Braided Pipes,Premium,,\n'
+    )
+
+    assert 'more cell' in report[0]['message']
+    assert report[1]['message'] is None
+    assert len(operations) == 1
+
+
+class FakeCollection:
+    def __init__(self, result=None, error=None):
+        self.result, self.error, self.batches = result, error, []
+
+    def bulk_write(self, batch, ordered):
+        assert ordered is False
+        self.batches.append(batch)
+        if self.error:
+            raise self.error
+        return self.result
+
+
+class FakeResult:
+    def __init__(self, upserted_ids):
+        self.upserted_ids = upserted_ids
+
+
+def operations(n):
+    return [UpdateOne({'slug': f'p{i}'}, {'$set': {'name': f'P{i}'}}, upsert=True) for i in range(n)]
+
+
+def test_run_bulk_batches_and_reports_upserts():
+    collection = FakeCollection(result=FakeResult({0: 'new-id'}))
+
+    outcomes = run_bulk(collection, operations(3), batch_size=2)
+
+    assert [len(b) for b in collection.batches] == [2, 1]
+    # Indexes in a result are per batch, so index 0 is an upsert in both batches
+    assert outcomes == [('created', None), ('ok', None), ('created', None)]
+
+
+def test_run_bulk_maps_write_errors_to_their_operation():
+    error = BulkWriteError({
+        'writeErrors': [{'index': 1, 'errmsg': 'E11000 duplicate key'}],
+        'upserted': [{'index': 0, '_id': 'new-id'}],
+    })
+    collection = FakeCollection(error=error)
+
+    outcomes = run_bulk(collection, operations(3))
+
+    assert outcomes == [('created', None), ('error', 'E11000 duplicate key'), ('ok', None)]